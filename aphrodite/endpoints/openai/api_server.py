@@ -68,8 +68,18 @@ async def lifespan(app: fastapi.FastAPI):
         _running_tasks.add(task)
         task.add_done_callback(_running_tasks.remove)
 
+    # Load the serving tokenizers (and the chat template) now, so a bad
+    # configuration fails startup rather than every request.
+    await asyncio.gather(openai_serving_chat._ensure_init(),
+                         openai_serving_completion._ensure_init(),
+                         openai_serving_embedding._ensure_init())
+
     yield
 
+    for serving in (openai_serving_chat, openai_serving_completion,
+                    openai_serving_embedding):
+        await serving.close()
+
 
 @router.get("/health")
 async def health() -> Response:
@@ -36,7 +36,11 @@ class OpenAIServingChat(OpenAIServing):
                          served_model_names=served_model_names,
                          lora_modules=lora_modules)
         self.response_role = response_role
-        self._load_chat_template(chat_template)
+        self.chat_template = chat_template
+
+    async def _post_init(self):
+        await super()._post_init()
+        self._load_chat_template(self.chat_template)
 
     async def create_chat_completion(
         self, request: ChatCompletionRequest, raw_request: Request
@@ -51,9 +55,10 @@ class OpenAIServingChat(OpenAIServing):
         NOTE: Currently we do not support the following feature:
             - function_call (Users should implement this by themselves)
         """
-        error_check_ret = await self._check_model(request)
-        if error_check_ret is not None:
-            return error_check_ret
+        await self._ensure_init()
+        lora_request = await self._resolve_model(request)
+        if isinstance(lora_request, ErrorResponse):
+            return lora_request
 
         # Deal with list in messages.content
         # Just replace the content list with the very first text message
@@ -80,7 +85,6 @@ class OpenAIServingChat(OpenAIServing):
                 request, prompt=prompt)
             sampling_params = request.to_sampling_params(
                 self.tokenizer.vocab_size)
-            lora_request = self._maybe_get_lora(request)
             guided_decode_logits_processor = (
                 await get_guided_decoding_logits_processor(
                     request.guided_decoding_backend, request, await
@@ -19,6 +19,7 @@ from aphrodite.endpoints.openai.protocol import (
     CompletionResponseChoice,
     CompletionResponseStreamChoice,
     CompletionStreamResponse,
+    ErrorResponse,
     LogProbs,
     UsageInfo,
 )
@@ -77,9 +78,10 @@ class OpenAIServingCompletion(OpenAIServing):
             - suffix (the language models we currently support do not support
             suffix)
         """
-        error_check_ret = await self._check_model(request)
-        if error_check_ret is not None:
-            return error_check_ret
+        await self._ensure_init()
+        lora_request = await self._resolve_model(request)
+        if isinstance(lora_request, ErrorResponse):
+            return lora_request
 
         # Return error for unsupported features.
         if request.suffix is not None:
@@ -95,7 +97,6 @@ class OpenAIServingCompletion(OpenAIServing):
         try:
             sampling_params = request.to_sampling_params(
                 self.tokenizer.vocab_size)
-            lora_request = self._maybe_get_lora(request)
             decoding_config = self.engine.engine.decoding_config
             guided_decoding_backend = request.guided_decoding_backend \
                 or decoding_config.guided_decoding_backend
@@ -1,13 +1,17 @@
 import asyncio
-import json
+import copy
+from contextlib import suppress
 from dataclasses import dataclass
+from functools import lru_cache
 from http import HTTPStatus
-from typing import Dict, List, Optional, Tuple, Union
+from itertools import accumulate, islice
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from loguru import logger
 from pydantic import conint
 
 from aphrodite.common.sequence import Logprob
+from aphrodite.common.utils import LRUCache
 from aphrodite.endpoints.openai.protocol import (
     ChatCompletionRequest, CompletionRequest, EmbeddingRequest, ErrorResponse,
     LogProbs, ModelCard, ModelList, ModelPermission, Prompt)
@@ -15,6 +19,17 @@ from aphrodite.engine.async_aphrodite import AsyncAphrodite
 from aphrodite.lora.request import LoRARequest
 from aphrodite.transformers_utils.tokenizer import get_tokenizer
 
+# Every card advertises the same permissions, so they share one instance.
+_MODEL_PERMISSION = ModelPermission()
+
+
+@lru_cache(maxsize=256)
+def _streaming_error_json(message: str, err_type: str, code: int) -> str:
+    error = ErrorResponse(message=message, type=err_type, code=code)
+    # Serialize straight from pydantic-core instead of building a dict
+    # and running it through the json module.
+    return '{"error":' + error.model_dump_json() + '}'
+
 
 @dataclass
 class LoRA:
@@ -22,6 +37,102 @@ class LoRA:
     local_path: str
 
 
+class _TokenizerBatcher:
+    """Coalesces concurrent tokenizer calls into a single batched call.
+
+    Items submitted within `batch_wait_s` of the first pending item are
+    handed to `batch_fn` together, which must return one result per item
+    in the same order. A lone item is handled without waiting. If a batch
+    fails, its items are retried one by one so only the bad ones fail. The
+    batch runs on the event loop thread, since HF fast tokenizers are not
+    safe to share across threads.
+    """
+
+    def __init__(self,
+                 batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 64,
+                 batch_wait_s: float = 0.002):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._batch_wait_s = batch_wait_s
+        # Created on first use so they bind to the serving event loop.
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Items taken off the queue by the worker but not yet resolved.
+        self._in_flight: List[Tuple[Any, asyncio.Future]] = []
+
+    async def submit(self, item: Any) -> Any:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def close(self):
+        """Stop the worker and cancel any requests it hasn't resolved."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._worker
+        self._worker = None
+        pending = self._in_flight
+        self._in_flight = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.cancel()
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            self._in_flight = batch
+            if not self._queue.empty():
+                # Others are already waiting; give stragglers a moment to
+                # join the batch as well.
+                await asyncio.sleep(self._batch_wait_s)
+            while len(batch) < self._max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            self._run_batch(batch)
+            self._in_flight = []
+
+    def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = self._batch_fn([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self._run_each(batch)
+            return
+        if len(results) != len(batch):
+            error = RuntimeError(f"Tokenizer returned {len(results)} results "
+                                 f"for a batch of {len(batch)}.")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _run_each(self, batch: List[Tuple[Any, asyncio.Future]]):
+        for item, future in batch:
+            if future.done():
+                continue
+            try:
+                future.set_result(self._batch_fn([item])[0])
+            except Exception as e:
+                future.set_exception(e)
+
+
 class OpenAIServing:
 
     def __init__(self,
@@ -30,6 +141,8 @@ class OpenAIServing:
                  lora_modules=Optional[List[LoRA]]):
         self.engine = engine
         self.served_model_names = served_model_names
+        # The list keeps the advertised order; the set is for lookups.
+        self._served_model_set = frozenset(served_model_names)
         if lora_modules is None:
             self.lora_requests = []
         else:
@@ -40,64 +153,109 @@ class OpenAIServing:
                     lora_local_path=lora.local_path,
                 ) for i, lora in enumerate(lora_modules, start=1)
             ]
+        # Name -> request index kept in sync with self.lora_requests, so
+        # per-request model resolution doesn't scan every adapter.
+        self._lora_by_name: Dict[str, LoRARequest] = {
+            lora.lora_name: lora
+            for lora in self.lora_requests
+        }
+
+        # Rebuilt lazily by show_available_models after LoRA changes.
+        self._models_cache: Optional[ModelList] = None
 
         self.max_model_len = 0
         self.tokenizer = None
-
+        # Decoded text of single token ids, for positions that come without
+        # logprob entries in _create_logprobs.
+        self._decoded_tokens: LRUCache[str] = LRUCache(capacity=8192)
+        self._tokenize_batcher = _TokenizerBatcher(self._tokenize_batch)
+
+        # _post_init runs on the first request instead of here, so building
+        # the server doesn't spin up a throwaway event loop to load the
+        # tokenizer. See _ensure_init.
+        self._init_task: Optional[asyncio.Task] = None
+
+    async def _ensure_init(self):
+        """Run _post_init once, on the serving event loop.
+
+        Concurrent callers await the same task. The API server calls this
+        from its lifespan so initialization errors surface at startup. If
+        the task fails or is cancelled, the next call retries."""
+        if self._init_task is None:
+            self._init_task = asyncio.create_task(self._post_init())
+        task = self._init_task
         try:
-            event_loop = asyncio.get_running_loop()
-        except RuntimeError:
-            event_loop = None
-
-        if event_loop is not None and event_loop.is_running():
-            # If the current is instanced by Ray Serve,
-            # there is already a running event loop
-            event_loop.create_task(self._post_init())
-        else:
-            # When using single Aphrodite without engine_use_ray
-            asyncio.run(self._post_init())
+            # Shielded so a cancelled caller (e.g. a client disconnect)
+            # doesn't cancel the initialization other requests share.
+            await asyncio.shield(task)
+        except BaseException:
+            if (task.done() and (task.cancelled() or task.exception())
+                    and self._init_task is task):
+                self._init_task = None
+            raise
 
     async def _post_init(self):
         engine_model_config = await self.engine.get_model_config()
         self.max_model_len = engine_model_config.max_model_len
 
-        # A separate tokenizer to map token IDs to strings.
-        self.tokenizer = get_tokenizer(
-            engine_model_config.tokenizer,
-            tokenizer_mode=engine_model_config.tokenizer_mode,
-            trust_remote_code=engine_model_config.trust_remote_code,
-            revision=engine_model_config.revision,
-            truncation_side="left")
+        if engine_model_config.skip_tokenizer_init:
+            self.tokenizer = get_tokenizer(
+                engine_model_config.tokenizer,
+                tokenizer_mode=engine_model_config.tokenizer_mode,
+                trust_remote_code=engine_model_config.trust_remote_code,
+                revision=engine_model_config.revision,
+                truncation_side="left")
+        else:
+            # Reuse the engine's tokenizer instead of loading another one.
+            # A shallow copy keeps truncation_side (and the chat template
+            # set by serving_chat) off the engine's instance; a fast
+            # tokenizer re-applies truncation to its backend on every call.
+            self.tokenizer = copy.copy(await self.engine.get_tokenizer())
+            self.tokenizer.truncation_side = "left"
+
+    async def close(self):
+        """Stop the tokenizer batching worker."""
+        await self._tokenize_batcher.close()
 
     async def show_available_models(self) -> ModelList:
         """Show available models. Right now we only have one model."""
+        if self._models_cache is not None:
+            return self._models_cache
+
+        root = self.served_model_names[0]
         model_cards = [
             ModelCard(id=served_model_name,
-                      root=self.served_model_names[0],
-                      permission=[ModelPermission()])
+                      root=root,
+                      permission=[_MODEL_PERMISSION])
             for served_model_name in self.served_model_names
         ]
         lora_cards = [
             ModelCard(id=lora.lora_name,
-                      root=self.served_model_names[0],
-                      permission=[ModelPermission()])
+                      root=root,
+                      permission=[_MODEL_PERMISSION])
             for lora in self.lora_requests
         ]
         model_cards.extend(lora_cards)
-        return ModelList(data=model_cards)
+        self._models_cache = ModelList(data=model_cards)
+        return self._models_cache
 
     async def tokenize(self, prompt: Prompt):
         """Tokenize a given prompt."""
-        tokenized_prompt = self.tokenizer.tokenize(prompt.prompt)
-        token_ids = self.tokenizer.convert_tokens_to_ids(tokenized_prompt)
-        return {"value": len(tokenized_prompt), "ids": token_ids}
+        await self._ensure_init()
+        token_ids = await self._tokenize_batcher.submit(prompt.prompt)
+        return {"value": len(token_ids), "ids": token_ids}
 
     async def detokenize(self, token_ids: List[int]):
         """Detokenize a given list of token IDs."""
-        tokens = self.tokenizer.convert_ids_to_tokens(token_ids)
-        detokenized_text = self.tokenizer.convert_tokens_to_string(tokens)
+        await self._ensure_init()
+        # Not batched: HF batch_decode is only a loop over decode().
+        detokenized_text = self.tokenizer.decode(
+            token_ids, clean_up_tokenization_spaces=False)
         return {"value": detokenized_text}
 
+    def _tokenize_batch(self, prompts: List[str]) -> List[List[int]]:
+        return self.tokenizer(prompts, add_special_tokens=False).input_ids
+
     def _create_logprobs(
         self,
         token_ids: List[int],
@@ -107,17 +265,22 @@ class OpenAIServing:
     ) -> LogProbs:
         """Create OpenAI-style logprobs."""
         logprobs = LogProbs()
-        last_token_len = 0
         if num_output_top_logprobs:
             logprobs.top_logprobs = []
 
         for i, token_id in enumerate(token_ids):
             step_top_logprobs = top_logprobs[i]
             if step_top_logprobs is None:
-                token = self.tokenizer.decode(token_id)
+                # Tokens without a logprob entry are decoded here; the cache
+                # spares repeated decode() calls for common tokens.
+                token = self._decoded_tokens.get(token_id)
+                if token is None:
+                    token = self.tokenizer.decode(token_id)
+                    self._decoded_tokens.put(token_id, token)
                 logprobs.tokens.append(token)
                 logprobs.token_logprobs.append(None)
-                logprobs.top_logprobs.append(None)
+                if num_output_top_logprobs:
+                    logprobs.top_logprobs.append(None)
             else:
                 token_logprob = step_top_logprobs[token_id].logprob
                 token = step_top_logprobs[token_id].decoded_token
@@ -125,28 +288,20 @@ class OpenAIServing:
                 logprobs.token_logprobs.append(token_logprob)
 
                 if num_output_top_logprobs:
+                    # Convert float("-inf") to the JSON-serializable float
+                    # that OpenAI uses. A conditional is notably cheaper
+                    # than max() here.
                     logprobs.top_logprobs.append({
-                        # Convert float("-inf") to the
-                        # JSON-serializable float that OpenAI uses
-                        p.decoded_token: max(p.logprob, -9999.0)
-                        for i, p in step_top_logprobs.items()
+                        p.decoded_token: (
+                            p.logprob if p.logprob > -1000.0 else -1000.0)
+                        for p in step_top_logprobs.values()
                     } if step_top_logprobs else None)
 
-            # TODO: Check if this is still needed
-            if logprobs.top_logprobs:
-                logprobs.top_logprobs = [{
-                    k: v if v > -1000 else -1000
-                    for k, v in top_logprob.items()
-                } for top_logprob in logprobs.top_logprobs
-                                         if top_logprob is not None
-                                         ]  # noqa: E501
-
-            if len(logprobs.text_offset) == 0:
-                logprobs.text_offset.append(initial_text_offset)
-            else:
-                logprobs.text_offset.append(logprobs.text_offset[-1] +
-                                            last_token_len)
-            last_token_len = len(token)
+        # Each token starts where the previous one ended.
+        num_tokens = len(logprobs.tokens)
+        logprobs.text_offset = list(
+            accumulate(map(len, islice(logprobs.tokens, num_tokens - 1)),
+                       initial=initial_text_offset)) if num_tokens else []
         return logprobs
 
     def create_error_response(
@@ -163,50 +318,60 @@ class OpenAIServing:
             message: str,
             err_type: str = "BadRequestError",
             status_code: HTTPStatus = HTTPStatus.BAD_REQUEST) -> str:
-        json_str = json.dumps({
-            "error":
-            self.create_error_response(message=message,
-                                       err_type=err_type,
-                                       status_code=status_code).model_dump()
-        })
-        return json_str
-
-    async def _check_model(self, request) -> Optional[ErrorResponse]:
-        if request.model in self.served_model_names:
-            return
-        if request.model in [lora.lora_name for lora in self.lora_requests]:
-            return
+        # The serialized string is immutable, so repeated errors (e.g. the
+        # same validation failure across a burst of streams) are cached.
+        return _streaming_error_json(message, err_type, status_code.value)
+
+    async def _resolve_model(
+            self, request) -> Union[LoRARequest, None, ErrorResponse]:
+        """Resolve `request.model` in one lookup.
+
+        Returns None for a served base model, the matching LoRARequest for
+        a LoRA adapter, or an ErrorResponse if the model doesn't exist."""
+        if request.model in self._served_model_set:
+            return None
+        lora = self._lora_by_name.get(request.model)
+        if lora is not None:
+            return lora
         return self.create_error_response(
             message=f"The model `{request.model}` does not exist.",
             err_type="NotFoundError",
             status_code=HTTPStatus.NOT_FOUND)
 
+    async def _check_model(self, request) -> Optional[ErrorResponse]:
+        resolved = await self._resolve_model(request)
+        if isinstance(resolved, ErrorResponse):
+            return resolved
+        return None
+
     def add_lora(self, lora: LoRA):
-        if lora.name in [
-                existing_lora.lora_name for existing_lora in self.lora_requests
-        ]:
+        if lora.name in self._lora_by_name:
             logger.error(f"LoRA with name {lora.name} already exists.")
             return
-        self.lora_requests.append(
-            LoRARequest(
-                lora_name=lora.name,
-                lora_int_id=len(self.lora_requests) + 1,
-                lora_local_path=lora.local_path,
-            ))
+        lora_request = LoRARequest(
+            lora_name=lora.name,
+            lora_int_id=len(self.lora_requests) + 1,
+            lora_local_path=lora.local_path,
+        )
+        self.lora_requests.append(lora_request)
+        self._lora_by_name[lora.name] = lora_request
+        self._models_cache = None
 
     def remove_lora(self, lora_name: str):
         self.lora_requests = [
             lora for lora in self.lora_requests if lora.lora_name != lora_name
         ]
+        self._lora_by_name.pop(lora_name, None)
+        self._models_cache = None
 
     def _maybe_get_lora(self, request) -> Optional[LoRARequest]:
-        if request.model in self.served_model_names:
+        if request.model in self._served_model_set:
             return
-        for lora in self.lora_requests:
-            if request.model == lora.lora_name:
-                return lora
+        lora = self._lora_by_name.get(request.model)
+        if lora is not None:
+            return lora
         # if _check_model has been called earlier, this will be unreachable
-        raise ValueError("The model `{request.model}` does not exist.")
+        raise ValueError(f"The model `{request.model}` does not exist.")
 
     def _validate_prompt_and_tokenize(
         self,
@@ -215,7 +380,7 @@ class OpenAIServing:
         prompt: Optional[str] = None,
         prompt_ids: Optional[List[int]] = None,
         truncate_prompt_tokens: Optional[conint(ge=1)] = None
-    ) -> Tuple[List[int], str]:
+    ) -> Tuple[List[int], Optional[str]]:
         if not (prompt or prompt_ids):
             raise ValueError("Either prompt or prompt_ids should be provided.")
         if (prompt and prompt_ids):
@@ -228,35 +393,40 @@ class OpenAIServing:
                 "max_length": truncate_prompt_tokens,
             }
             input_ids = self.tokenizer(prompt, **tokenizer_kwargs).input_ids
-        elif truncate_prompt_tokens is not None:
+        elif (truncate_prompt_tokens is not None
+              and len(prompt_ids) > truncate_prompt_tokens):
             input_ids = prompt_ids[-truncate_prompt_tokens:]
         else:
             input_ids = prompt_ids
 
-        input_text = prompt if prompt is not None else self.tokenizer.decode(
-            prompt_ids)
         token_num = len(input_ids)
+        max_model_len = self.max_model_len
 
         # Note: EmbeddingRequest doesn't have max_tokens
         if isinstance(request, EmbeddingRequest):
-            if token_num > self.max_model_len:
+            if token_num > max_model_len:
                 raise ValueError(
                     f"This model's maximum context length is "
-                    f"{self.max_model_len} tokens. However, you requested "
+                    f"{max_model_len} tokens. However, you requested "
                     f"{token_num} tokens in the input for embedding "
                     f"generation. Please reduce the length of the input.", )
-            return input_ids, input_text
+            # Embedding outputs never carry the prompt text, so token id
+            # prompts are not decoded back to a string.
+            return input_ids, prompt
 
         if request.max_tokens is None:
-            request.max_tokens = self.max_model_len - token_num
+            request.max_tokens = max_model_len - token_num
 
-        if token_num + request.max_tokens > self.max_model_len:
+        if token_num + request.max_tokens > max_model_len:
             raise ValueError(
                 f"This model's maximum context length is "
-                f"{self.max_model_len} tokens. However, you requested "
+                f"{max_model_len} tokens. However, you requested "
                 f"{request.max_tokens + token_num} tokens "
                 f"({token_num} in the messages, "
                 f"{request.max_tokens} in the completion). "
                 f"Please reduce the length of the messages or completion.", )
-        else:
-            return input_ids, input_text
+
+        # Only decoded once the request is known to be valid.
+        input_text = prompt if prompt is not None else self.tokenizer.decode(
+            input_ids)
+        return input_ids, input_text
@@ -7,10 +7,13 @@ from loguru import logger
 from aphrodite.common.config import CacheConfig, ModelConfig, SchedulerConfig
 from aphrodite.common.sequence import ExecuteModelRequest, SamplerOutput
 from aphrodite.common.utils import (get_distributed_init_method, get_ip,
-                                    get_open_port, make_async)
+                                    get_open_port, make_async,
+                                    print_warning_once)
 from aphrodite.executor.executor_base import ExecutorAsyncBase, ExecutorBase
 from aphrodite.lora.request import LoRARequest
 
+_GB = 1 << 30
+
 
 class CPUExecutor(ExecutorBase):
 
@@ -93,11 +96,17 @@ class CPUExecutor(ExecutorBase):
 
 class CPUExecutorAsync(CPUExecutor, ExecutorAsyncBase):
 
+    def _init_executor(self) -> None:
+        super()._init_executor()
+        # Wrap once here instead of on every step.
+        self._execute_model_async = make_async(
+            self.driver_worker.execute_model)
+
     async def execute_model_async(
             self,
             execute_model_req: ExecuteModelRequest) -> List[SamplerOutput]:
-        output = await make_async(self.driver_worker.execute_model
-                                  )(execute_model_req=execute_model_req, )
+        output = await self._execute_model_async(
+            execute_model_req=execute_model_req)
         return output
 
     async def check_health_async(self) -> None:
@@ -128,7 +137,6 @@ def _verify_and_get_scheduler_config(
 
 
 def _verify_and_get_cache_config(config: CacheConfig) -> CacheConfig:
-    _GB = 1 << 30
     if config.enable_prefix_caching:
         logger.warning("Prefix caching is not supported on CPU, disable it.")
         config.enable_prefix_caching = False
@@ -139,7 +147,7 @@ def _verify_and_get_cache_config(config: CacheConfig) -> CacheConfig:
     if kv_cache_space >= 0:
         if kv_cache_space == 0:
             config.cpu_kvcache_space_bytes = 4 * _GB  # type: ignore
-            logger.warning(
+            print_warning_once(
                 "Environment variable APHRODITE_CPU_KVCACHE_SPACE (GB) "
                 "for CPU backend is not set, using 4 by default.")
         else:
@@ -13,6 +13,7 @@ from aphrodite.common.config import (APHRODITE_USE_MODELSCOPE, CacheConfig,
                                      DeviceConfig, LoadConfig, LoadFormat,
                                      LoRAConfig, ModelConfig, ParallelConfig,
                                      SchedulerConfig, VisionLanguageConfig)
+from aphrodite.distributed import get_tensor_model_parallel_rank
 from aphrodite.modeling.model_loader.tensorizer import (
     TensorizerConfig, is_aphrodite_tensorized, load_with_tensorizer,
     tensorizer_weights_iterator)
@@ -286,12 +287,14 @@ class TensorizerLoader(BaseModelLoader):
         self.tensorizer_config.verify_with_parallel_config(parallel_config)
 
     def _get_weights_iterator(
-            self) -> Generator[Tuple[str, torch.Tensor], None, None]:
-        tensorizer_args = self.tensorizer_config._construct_tensorizer_args()
+        self, tensorizer_config: TensorizerConfig
+    ) -> Generator[Tuple[str, torch.Tensor], None, None]:
+        tensorizer_args = tensorizer_config._construct_tensorizer_args()
         return tensorizer_weights_iterator(tensorizer_args)
 
     def _load_model_serialized_cpu(
         self,
+        tensorizer_config: TensorizerConfig,
         model_config: ModelConfig,
         device_config: DeviceConfig,
         lora_config: Optional[LoRAConfig],
@@ -310,11 +313,12 @@ class TensorizerLoader(BaseModelLoader):
                                           lora_config, vision_language_config,
                                           cache_config)
 
-            model.load_weights(self._get_weights_iterator())
+            model.load_weights(self._get_weights_iterator(tensorizer_config))
         return model.eval()
 
     def _load_model_serialized(
         self,
+        tensorizer_config: TensorizerConfig,
         model_config: ModelConfig,
         device_config: DeviceConfig,
         lora_config: Optional[LoRAConfig],
@@ -335,7 +339,7 @@ class TensorizerLoader(BaseModelLoader):
                 extra_kwargs["quant_config"] = quant_config
                 extra_kwargs["cache_config"] = cache_config
 
-                tensorizer_config = copy.copy(self.tensorizer_config)
+                tensorizer_config = copy.copy(tensorizer_config)
                 tensorizer_config.model_class = model_class
                 tensorizer_config.hf_config = model_config.hf_config
                 tensorizer_config.dtype = model_config.dtype
@@ -351,14 +355,19 @@ class TensorizerLoader(BaseModelLoader):
                    scheduler_config: SchedulerConfig,
                    cache_config: CacheConfig) -> nn.Module:
         self._verify_config(model_config, parallel_config)
-
-        if is_aphrodite_tensorized(self.tensorizer_config):
-            return self._load_model_serialized(model_config, device_config,
-                                               lora_config,
+        # Each rank of a sharded model loads only its own file, so all
+        # ranks deserialize concurrently. The per-rank copy stays local so
+        # self.tensorizer_config still describes the sharded model.
+        tensorizer_config = self.tensorizer_config.for_rank(
+            get_tensor_model_parallel_rank())
+
+        if is_aphrodite_tensorized(tensorizer_config):
+            return self._load_model_serialized(tensorizer_config, model_config,
+                                               device_config, lora_config,
                                                vision_language_config,
                                                cache_config)
-        return self._load_model_serialized_cpu(model_config, device_config,
-                                               lora_config,
+        return self._load_model_serialized_cpu(tensorizer_config, model_config,
+                                               device_config, lora_config,
                                                vision_language_config,
                                                cache_config)
 
@@ -1,19 +1,24 @@
 import argparse
+import contextlib
+import copy
 import dataclasses
 import io
+import itertools
 import os
 import time
 import typing
 from dataclasses import dataclass
-from functools import partial
-from typing import Generator, Optional, Tuple, Type, Union
+from functools import lru_cache, partial
+from typing import (ContextManager, Generator, Optional, Tuple, Type, Union)
 
+import psutil
 import torch
 from loguru import logger
 from torch import nn
 from transformers import PretrainedConfig
 
 from aphrodite.common.config import ModelConfig, ParallelConfig
+from aphrodite.common.utils import is_hip
 from aphrodite.engine.aphrodite_engine import AphroditeEngine
 from aphrodite.modeling.layers.vocab_parallel_embedding import \
     VocabParallelEmbedding
@@ -57,6 +62,25 @@ class TensorizerConfig:
     hf_config: Optional[PretrainedConfig] = None
     dtype: Optional[Union[str, torch.dtype]] = None
 
+    @property
+    def _is_sharded(self) -> bool:
+        # Models serialized with tensor parallelism are stored as one file
+        # per rank, addressed by a URI template such as
+        # `s3://bucket/model-rank-{rank}.tensors`.
+        return (isinstance(self.tensorizer_uri, str)
+                and "{rank}" in self.tensorizer_uri)
+
+    def for_rank(self, rank: int) -> "TensorizerConfig":
+        """Return a copy of this config that points at `rank`'s shard.
+        Unsharded configs are returned unchanged."""
+        if not self._is_sharded:
+            return self
+        config = copy.copy(self)
+        # Not str.format: other braces in the URI must be left alone.
+        config.tensorizer_uri = self.tensorizer_uri.replace(
+            "{rank}", str(rank))
+        return config
+
     def _construct_tensorizer_args(self) -> "TensorizerArgs":
         tensorizer_args = {
             "tensorizer_uri": self.tensorizer_uri,
@@ -75,12 +99,12 @@ class TensorizerConfig:
         parallel_config: "ParallelConfig",
     ) -> None:
         if (parallel_config.tensor_parallel_size > 1
-                and self.tensorizer_uri is not None):
+                and self.tensorizer_uri is not None and not self._is_sharded):
             raise ValueError(
-                "Loading to multiple GPUs is not currently supported with "
-                "aphrodite-serialized models. Please set "
-                "tensor_parallel_size=1. or use a non-aphrodite-serialized "
-                "model, such as a serialized Hugging Face `PretrainedModel`.")
+                "Loading to multiple GPUs requires a model serialized with "
+                "the same tensor_parallel_size, one file per rank. Set "
+                "tensorizer_uri to a template containing `{rank}`, e.g. "
+                "`model-rank-{rank}.tensors`, or set tensor_parallel_size=1.")
 
     def verify_with_model_config(self, model_config: "ModelConfig") -> None:
         if (model_config.quantization is not None
@@ -90,6 +114,58 @@ class TensorizerConfig:
                 "aphrodite is unstable and may lead to errors.")
 
 
+def _prefetch_local_file(path: Union[str, bytes, os.PathLike]) -> None:
+    """Ask the kernel to start reading a local model file into the page
+    cache, so tensorizer's readers mostly hit memory instead of waiting on
+    on-demand reads.
+
+    The advice is attached to the file, not the descriptor, so it also
+    benefits the descriptors each reader thread opens. At most half of the
+    available RAM is prefetched, so the start of the file isn't evicted
+    before it's read."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        size = os.fstat(fd).st_size
+        length = min(size, psutil.virtual_memory().available // 2)
+        os.posix_fadvise(fd, 0, length, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=None)
+def _enable_pinned_host_register() -> None:
+    """Make the CUDA host allocator pin memory with cudaHostRegister.
+
+    tensorizer stages tensors in pinned buffers before copying them to the
+    GPU; with this setting those copies DMA straight from the buffers
+    instead of going through an extra staging memcpy. Left alone if the
+    user already configured it in PYTORCH_CUDA_ALLOC_CONF."""
+    if not torch.cuda.is_available() or is_hip():
+        return
+    alloc_conf = os.environ.get("PYTORCH_CUDA_ALLOC_CONF", "")
+    if "pinned_use_cuda_host_register" in alloc_conf:
+        return
+    try:
+        # Read by the host allocator on every pinned allocation, so this
+        # applies even after CUDA has been initialized. The allocator resets
+        # any option missing from the string, so the user's existing
+        # settings are passed along with the new one.
+        torch.cuda.memory._set_allocator_settings(",".join(
+            filter(None, [alloc_conf, "pinned_use_cuda_host_register:True"])))
+    except (AttributeError, RuntimeError) as e:
+        logger.warning(
+            "Could not enable pinned_use_cuda_host_register for faster "
+            f"tensorizer loading ({e}). Consider setting "
+            "PYTORCH_CUDA_ALLOC_CONF=pinned_use_cuda_host_register:True.")
+
+
 def load_with_tensorizer(tensorizer_config: TensorizerConfig,
                          **extra_kwargs) -> nn.Module:
     tensorizer = TensorizerAgent(tensorizer_config, **extra_kwargs)
@@ -123,7 +199,9 @@ class TensorizerArgs:
           inferred as Aphrodite models.
       verify_hash: If True, the hashes of each tensor will be verified against 
           the hashes stored in the metadata. A `HashMismatchError` will be 
-          raised if any of the hashes do not match.
+          raised if any of the hashes do not match. Hashing is done by the
+          reader threads as each tensor is read, so it is parallelized
+          across `num_readers`.
       num_readers: Controls how many threads are allowed to read concurrently
           from the source file. Default is `None`, which will dynamically set
           the number of readers based on the number of available 
@@ -198,7 +276,8 @@ class TensorizerArgs:
             action="store_true",
             help="If enabled, the hashes of each tensor will be verified"
             " against the hashes stored in the file metadata. An exception"
-            " will be raised if any of the hashes do not match.",
+            " will be raised if any of the hashes do not match. Hashing runs"
+            " on the reader threads, so it scales with --num-readers.",
         )
         group.add_argument(
             "--encryption-keyfile",
@@ -263,6 +342,7 @@ class TensorizerAgent:
                 "`pip install aphrodite-engine[tensorizer]`. "
                 "Error message: {}".format(tensorizer_error_msg))
 
+        _enable_pinned_host_register()
         self.tensorizer_config = tensorizer_config
         self.tensorizer_args = (
             self.tensorizer_config._construct_tensorizer_args())
@@ -275,7 +355,11 @@ class TensorizerAgent:
 
     def _init_model(self):
         model_args = self.tensorizer_config.hf_config
-        model_args.torch_dtype = self.tensorizer_config.dtype
+        # With no dtype requested, keep the config's own torch_dtype (the one
+        # the checkpoint was saved in) rather than clobbering it with None;
+        # the deserializer then loads tensors without any conversion.
+        if self.tensorizer_config.dtype is not None:
+            model_args.torch_dtype = self.tensorizer_config.dtype
         with no_init_or_tensor():
             return self.tensorizer_config.model_class(
                 config=model_args,
@@ -289,16 +373,22 @@ class TensorizerAgent:
             if (isinstance(child, VocabParallelEmbedding)
                     and child.weight.shape[0] <
                     child.num_embeddings_per_partition):
-                new_weight = torch.empty(child.num_embeddings_per_partition,
+                new_weight = torch.zeros(child.num_embeddings_per_partition,
                                          child.embedding_dim,
                                          dtype=child.weight.dtype,
                                          device=child.weight.device)
                 new_weight[:child.weight.shape[0]].copy_(child.weight.data)
-                new_weight[child.weight.shape[0]:].fill_(0)
                 child.weight.data = new_weight
 
     def _check_tensors_on_meta_device(self):
-        for tensor in self.model.state_dict().values():
+        # The tensors state_dict() would hold (parameters and persistent
+        # buffers), walked lazily so the first meta tensor ends the scan.
+        tensors = itertools.chain(
+            self.model.parameters(),
+            (buffer for module in self.model.modules()
+             for name, buffer in module.named_buffers(recurse=False)
+             if name not in module._non_persistent_buffers_set))
+        for tensor in tensors:
             if tensor.device.type == 'meta':
                 raise ValueError(
                     "The serialized model contains tensors on the meta device,"
@@ -307,6 +397,28 @@ class TensorizerAgent:
                     " specified match that of the serialized model, such as"
                     " its quantization.")
 
+    def _open_source(self) -> ContextManager:
+        """Return what TensorDeserializer should read from.
+
+        Local paths are passed through as-is so that each of tensorizer's
+        `num_readers` threads opens the file itself. Remote URIs are opened
+        here, since the S3 credentials in stream_params have to be applied;
+        tensorizer forks those streams per reader. Already-open file objects
+        can only be shared by multiple readers if tensorizer manages to
+        reopen them."""
+        uri = self.tensorizer_config.tensorizer_uri
+        if isinstance(uri, (str, bytes, os.PathLike)):
+            if os.path.isfile(uri):
+                _prefetch_local_file(uri)
+                return contextlib.nullcontext(uri)
+            return _read_stream(uri, **self.tensorizer_args.stream_params)
+        if self.tensorizer_args.num_readers != 1:
+            logger.warning(
+                "tensorizer_uri is an open file object, which may limit "
+                "deserialization to a single reader thread. Pass a path or "
+                "URI instead to allow concurrent reads.")
+        return contextlib.nullcontext(uri)
+
     def deserialize(self):
         """
         Deserialize the model using the TensorDeserializer. This method is
@@ -323,11 +435,8 @@ class TensorizerAgent:
         """
         before_mem = get_mem_usage()
         start = time.perf_counter()
-        with _read_stream(
-                self.tensorizer_config.tensorizer_uri,
-                **self.tensorizer_args.stream_params
-        ) as stream, TensorDeserializer(
-                stream,
+        with self._open_source() as source, TensorDeserializer(
+                source,
                 dtype=self.tensorizer_config.dtype,
                 **self.tensorizer_args.deserializer_params) as deserializer:
             deserializer.load_into_module(self.model)
@@ -379,11 +488,6 @@ def is_aphrodite_tensorized(tensorizer_config: "TensorizerConfig") -> bool:
     Returns:
         bool: True if the model is a Aphrodite model, False otherwise.
     """
-    tensorizer_args = tensorizer_config._construct_tensorizer_args()
-    deserializer = TensorDeserializer(open_stream(
-        tensorizer_args.tensorizer_uri, **tensorizer_args.stream_params),
-                                      **tensorizer_args.deserializer_params,
-                                      lazy_load=True)
     if tensorizer_config.aphrodite_tensorized:
         logger.warning(
             "Please note that newly serialized Aphrodite models are "
@@ -391,32 +495,39 @@ def is_aphrodite_tensorized(tensorizer_config: "TensorizerConfig") -> bool:
             "aphrodite_tensorized=True is only necessary for models serialized "
             "prior to this change.")
         return True
-    if (".aphrodite_tensorized_marker" in deserializer):
-        return True
-    return False
+
+    tensorizer_args = tensorizer_config._construct_tensorizer_args()
+    # lazy_load only reads the header, which is enough to look up the marker.
+    with TensorDeserializer(open_stream(tensorizer_args.tensorizer_uri,
+                                        **tensorizer_args.stream_params),
+                            **tensorizer_args.deserializer_params,
+                            lazy_load=True) as deserializer:
+        return ".aphrodite_tensorized_marker" in deserializer
+
+
+def _add_tensorized_marker(model: nn.Module) -> nn.Module:
+    if not hasattr(model, "aphrodite_tensorized_marker"):
+        model.register_parameter(
+            "aphrodite_tensorized_marker",
+            nn.Parameter(torch.tensor((1, ), device="meta"),
+                         requires_grad=False))
+    return model
 
 
 def get_pretensorized_aphrodite_model(engine: "AphroditeEngine") -> nn.Module:
     model = (engine.model_executor.driver_worker.model_runner.model)
-    model.register_parameter(
-        "aphrodite_tensorized_marker",
-        nn.Parameter(torch.tensor((1, ), device="meta"), requires_grad=False))
-    return model
+    return _add_tensorized_marker(model)
 
 
-def serialize_aphrodite_model(engine: "AphroditeEngine",
-                         tensorizer_config : TensorizerConfig,
-                         encryption_key_path: Optional[str] = None) \
-        -> nn.Module:
-
-    model = get_pretensorized_aphrodite_model(engine)
+def save_tensorized_model(model: nn.Module,
+                          tensorizer_config: TensorizerConfig,
+                          encryption_key: Optional[bytes] = None) -> nn.Module:
+    """Serialize a single model (or one tensor-parallel rank's shard of it)
+    to `tensorizer_config.tensorizer_uri`."""
+    model = _add_tensorized_marker(model)
     tensorizer_args = tensorizer_config._construct_tensorizer_args()
-    encryption_params = None
-    if encryption_key_path is not None:
-        encryption_params = EncryptionParams.random()
-        with _write_stream(encryption_key_path,
-                           **tensorizer_args.stream_params) as stream:
-            stream.write(encryption_params.key)
+    encryption_params = (EncryptionParams(encryption_key)
+                         if encryption_key is not None else None)
 
     with _write_stream(tensorizer_args.tensorizer_uri,
                        **tensorizer_args.stream_params) as stream:
@@ -426,3 +537,29 @@ def serialize_aphrodite_model(engine: "AphroditeEngine",
     logger.info("Successfully serialized model to "
                 f"{str(tensorizer_args.tensorizer_uri)}")
     return model
+
+
+def serialize_aphrodite_model(engine: "AphroditeEngine",
+                         tensorizer_config : TensorizerConfig,
+                         encryption_key_path: Optional[str] = None) \
+        -> nn.Module:
+    """Serialize the engine's model. With tensor parallelism, every rank
+    writes its own shard concurrently, so `tensorizer_uri` must be a
+    `{rank}` template; all shards share one encryption key."""
+    tensorizer_args = tensorizer_config._construct_tensorizer_args()
+    encryption_key = None
+    if encryption_key_path is not None:
+        encryption_key = EncryptionParams.random().key
+        with _write_stream(encryption_key_path,
+                           **tensorizer_args.stream_params) as stream:
+            stream.write(encryption_key)
+
+    if engine.parallel_config.tensor_parallel_size > 1:
+        tensorizer_config.verify_with_parallel_config(engine.parallel_config)
+        engine.model_executor._run_workers("save_tensorized_model",
+                                           tensorizer_config=tensorizer_config,
+                                           encryption_key=encryption_key)
+        return get_pretensorized_aphrodite_model(engine)
+
+    return save_tensorized_model(get_pretensorized_aphrodite_model(engine),
+                                 tensorizer_config.for_rank(0), encryption_key)
@@ -107,11 +107,15 @@ class CpuGpuBlockAllocator(DeviceAwareBlockAllocator):
             Device.CPU: cpu_block_allocator,
             Device.GPU: gpu_block_allocator,
         }
+        # CoW and prefix caching are GPU-only; keep a direct reference so
+        # those per-step calls skip the device lookup.
+        self._gpu_allocator = gpu_block_allocator
 
         self._block_ids_to_allocator: Dict[int, BlockAllocator] = {}
         for _, allocator in self._allocators.items():
             for block_id in allocator.all_block_ids:
                 self._block_ids_to_allocator[block_id] = allocator
+        self._all_block_ids = frozenset(self._block_ids_to_allocator)
 
     def allocate_mutable(self, prev_block: Optional[Block],
                          device: Device) -> Block:
@@ -197,32 +201,27 @@ class CpuGpuBlockAllocator(DeviceAwareBlockAllocator):
                 destination block IDs.
         """
         # CoW only supported on GPU
-        device = Device.GPU
-        return self._allocators[device].clear_copy_on_writes()
+        return self._gpu_allocator.clear_copy_on_writes()
 
     def mark_blocks_as_accessed(self, block_ids: List[int],
                                 now: float) -> None:
         """Mark blocks as accessed, only use for prefix caching."""
         # Prefix caching only supported on GPU.
-        device = Device.GPU
-        return self._allocators[device].mark_blocks_as_accessed(block_ids, now)
+        return self._gpu_allocator.mark_blocks_as_accessed(block_ids, now)
 
     def mark_blocks_as_computed(self, block_ids: List[int]) -> None:
         """Mark blocks as accessed, only use for prefix caching."""
         # Prefix caching only supported on GPU.
-        device = Device.GPU
-        return self._allocators[device].mark_blocks_as_computed(block_ids)
+        return self._gpu_allocator.mark_blocks_as_computed(block_ids)
 
     def get_common_computed_block_ids(
             self, seq_block_ids: List[List[int]]) -> List[int]:
         # Prefix caching only supported on GPU.
-        device = Device.GPU
-        return self._allocators[device].get_common_computed_block_ids(
-            seq_block_ids)
+        return self._gpu_allocator.get_common_computed_block_ids(seq_block_ids)
 
     @property
     def all_block_ids(self) -> FrozenSet[int]:
-        return frozenset(self._block_ids_to_allocator.keys())
+        return self._all_block_ids
 
     def promote_to_immutable_block(self, block: Block) -> BlockId:
         raise NotImplementedError
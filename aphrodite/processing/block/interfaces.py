@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import FrozenSet, List, Optional, Protocol, Tuple
+from typing import FrozenSet, List, Optional, Protocol, Sequence, Tuple
 
 from aphrodite.common.utils import Device
 
@@ -7,6 +7,10 @@ BlockId = int
 
 
 class Block(ABC):
+    # Blocks are created per sequence and can number in the hundreds of
+    # thousands; concrete subclasses declare __slots__ so instances carry no
+    # per-object __dict__.
+    __slots__ = ()
 
     @abstractmethod
     def append_token_ids(self, token_ids: List[int]) -> None:
@@ -25,7 +29,10 @@ class Block(ABC):
 
     @property
     @abstractmethod
-    def token_ids(self) -> List[int]:
+    def token_ids(self) -> Sequence[int]:
+        """The token ids stored in this block. Implementations may return a
+        compact sequence (e.g. ``array.array``) rather than a list; call
+        ``list()`` on it if a list is required."""
         pass
 
     @property
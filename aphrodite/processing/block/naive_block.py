@@ -1,4 +1,5 @@
-from typing import FrozenSet, Iterable, List, Optional, Set, Tuple
+from array import array
+from typing import FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
 from aphrodite.processing.block.common import (CopyOnWriteTracker, RefCounter,
                                                get_all_blocks_recursively)
@@ -237,6 +238,9 @@ class NaiveBlock(Block):
             If not provided, it defaults to self.
     """
 
+    __slots__ = ("_token_ids", "_block_size", "_prev_block", "_block_id",
+                 "_allocator", "_cow_target")
+
     def __init__(self,
                  prev_block: Optional[Block],
                  token_ids: List[int],
@@ -244,7 +248,9 @@ class NaiveBlock(Block):
                  allocator: BlockAllocator,
                  block_id: Optional[int] = None,
                  _cow_target: Optional[Block] = None):
-        self._token_ids: List[int] = []
+        # Stored as a C int array: appends copy the ids into a flat buffer
+        # instead of holding one PyObject pointer per token.
+        self._token_ids = array("i")
         self._block_size = block_size
         self._prev_block = prev_block
         self._block_id = block_id
@@ -303,7 +309,7 @@ class NaiveBlock(Block):
         return self._block_size - len(self._token_ids)
 
     @property
-    def token_ids(self) -> List[int]:
+    def token_ids(self) -> Sequence[int]:
         return self._token_ids
 
     @property
@@ -1,7 +1,6 @@
 """Token blocks."""
-from itertools import takewhile
-from os.path import commonprefix
-from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from itertools import islice, takewhile
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
 
 from aphrodite.processing.block.common import (CopyOnWriteTracker,
                                                get_all_blocks_recursively)
@@ -396,16 +395,28 @@ class PrefixCachingBlockAllocator(BlockAllocator):
         # prompt is cached. This would cause erroneous behavior in model
         # runner.
 
-        ids_list = [
-            list(
-                takewhile(lambda block_id: self.block_is_computed(block_id),
-                          seq[:-1])) for seq in seq_block_ids
-        ]
-        # It returns a list of int although type annotation says list of string.
-        return commonprefix([
-            ids for ids in ids_list  # type: ignore
-            if ids != []
-        ])
+        # Sequences with no computed blocks are ignored. The first sequence
+        # that has any sets the candidate prefix; every later one can only
+        # shorten it. A block id equal to one already in the prefix is the
+        # same block, so it is known to be computed and only needs comparing.
+        is_computed = self.block_is_computed
+        prefix: Optional[List[int]] = None
+        for seq in seq_block_ids:
+            if len(seq) < 2 or not is_computed(seq[0]):
+                continue
+            if prefix is None:
+                prefix = list(takewhile(is_computed, islice(seq,
+                                                            len(seq) - 1)))
+                continue
+            n = 0
+            for block_id in islice(seq, min(len(seq) - 1, len(prefix))):
+                if block_id != prefix[n]:
+                    break
+                n += 1
+            del prefix[n:]
+            if not prefix:
+                break
+        return prefix if prefix is not None else []
 
 
 class PrefixCachingBlock(Block):
@@ -428,6 +439,10 @@ class PrefixCachingBlock(Block):
             of this block. Defaults to None.
     """
 
+    __slots__ = ("_prev_block", "_cached_content_hash",
+                 "_cached_num_tokens_total", "_prefix_caching_allocator",
+                 "_last_accessed", "_computed", "_block")
+
     def __init__(
         self,
         prev_block: Optional[Block],
@@ -538,7 +553,7 @@ class PrefixCachingBlock(Block):
         return self._block.block_size
 
     @property
-    def token_ids(self) -> List[int]:
+    def token_ids(self) -> Sequence[int]:
         return self._block.token_ids
 
     @property
@@ -581,7 +596,7 @@ class PrefixCachingBlock(Block):
 
     @staticmethod
     def hash_block_tokens(is_first_block: bool, prev_block_hash: Optional[int],
-                          cur_block_token_ids: List[int]) -> int:
+                          cur_block_token_ids: Sequence[int]) -> int:
         """Computes a hash value corresponding to the contents of a block and
         the contents of the preceding block(s). The hash value is used for
         prefix caching.
@@ -593,7 +608,7 @@ class PrefixCachingBlock(Block):
             the sequence.
         - prev_block_hash (Optional[int]): The hash of the previous block. None
             if this is the first block.
-        - cur_block_token_ids (List[int]): A list of token ids in the current
+        - cur_block_token_ids (Sequence[int]): The token ids in the current
             block. The current block is assumed to be full.
 
         Returns:
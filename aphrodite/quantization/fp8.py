@@ -1,3 +1,4 @@
+import os
 from typing import Any, Dict, List, Optional, Tuple, Union
 from contextlib import suppress
 
@@ -6,6 +7,7 @@ from torch.nn import Module
 from torch.nn.parameter import Parameter
 from loguru import logger
 
+from aphrodite.common.utils import is_hip
 from aphrodite.modeling.layers.linear import LinearBase, LinearMethodBase
 from aphrodite.quantization.base_config import (QuantizationConfig)
 from aphrodite.modeling.utils import set_weight_attrs
@@ -15,13 +17,34 @@ with suppress(ImportError):
     from aphrodite._quant_C import quant_ops as ops
     HAS_QUANTS = True
 
+HAS_TRITON = False
+with suppress(ImportError):
+    from aphrodite.quantization import fp8_quant_triton
+    HAS_TRITON = True
+
+# Opt-in: quantize small dynamic-scale activations with the single-program
+# Triton kernel instead of ops.dynamic_scaled_fp8_quant. Off by default
+# until tests/benchmarks/fp8_quant.py shows where it wins.
+# Run Aphrodite with APHRODITE_FP8_TRITON_QUANT=1 to enable it.
+USE_TRITON_QUANT = (HAS_TRITON
+                    and os.getenv("APHRODITE_FP8_TRITON_QUANT", "0") == "1")
+
 ACTIVATION_SCHEMES = ["static", "dynamic"]
 
+_QKV_IDXS = {"q": 0, "k": 1, "v": 2}
+
+_FP8_FINFO = torch.finfo(torch.float8_e4m3fn)
+
+# Batches smaller than this are padded up to it before torch._scaled_mm.
+_SCALED_MM_MIN_BATCH = 17
+
 
 def scaled_fp8_quant(
     input: torch.Tensor,
     scale: Optional[torch.Tensor] = None,
     batch_dim_padding: Optional[int] = None,
+    out: Optional[torch.Tensor] = None,
+    scale_out: Optional[torch.Tensor] = None,
 ) -> Tuple[torch.Tensor, torch.Tensor]:
     """
     Quantize input tensor to FP8 and return quantized tensor and scale.
@@ -35,11 +58,18 @@ def scaled_fp8_quant(
         scale: Optional scaling factor for the FP8 quantization
         batch_dim_padding: If specified, pad the first dimension
             of the output to at least this value.
+        out: Optional preallocated FP8 output tensor with at least as many
+            rows as the input. Quantized rows are written to its head and
+            batch_dim_padding is ignored.
+        scale_out: Optional preallocated 1-element float32 tensor that
+            receives the dynamic scale. Ignored if scale is given.
     Returns:
         Tuple[torch.Tensor, torch.Tensor]: The output tensor in FP8 and
             scaling factor.
     """
-    if batch_dim_padding:
+    if out is not None:
+        output = out
+    elif batch_dim_padding:
         shape = (max(batch_dim_padding, input.shape[0]), *input.shape[1:])
         output = torch.empty(shape,
                              device=input.device,
@@ -47,7 +77,19 @@ def scaled_fp8_quant(
     else:
         output = torch.empty_like(input, dtype=torch.float8_e4m3fn)
     if scale is None:
-        scale = torch.zeros(1, device=input.device, dtype=torch.float32)
+        if (USE_TRITON_QUANT and input.numel() <= fp8_quant_triton.MAX_NUMEL
+                and input.is_contiguous()):
+            # Small (decode) batches: one fused launch that writes the scale.
+            scale = (scale_out if scale_out is not None else torch.empty(
+                1, device=input.device, dtype=torch.float32))
+            fp8_quant_triton.dynamic_scaled_fp8_quant(output, input, scale)
+            return output, scale
+        # Must start at zero (not torch.empty): the reduction kernel folds
+        # each thread block's amax into it with an atomic max.
+        if scale_out is not None:
+            scale = scale_out.zero_()
+        else:
+            scale = torch.zeros(1, device=input.device, dtype=torch.float32)
         ops.dynamic_scaled_fp8_quant(output, input, scale)
     else:
         ops.static_scaled_fp8_quant(output, input, scale)
@@ -125,6 +167,16 @@ class Fp8LinearMethod(LinearMethodBase):
         if not HAS_QUANTS:
             raise ImportError("Could not find the quantization kernels.")
         self.quant_config = quant_config
+        # The small-batch slowdown that padding works around is specific to
+        # the pre-Hopper torch._scaled_mm kernels; on SM90+ it is skipped.
+        # ROCm also reports major 9 (gfx90a/gfx94x), so it keeps padding.
+        major, _ = torch.cuda.get_device_capability()
+        self._pad_threshold = (0 if (not is_hip() and major >= 9) else
+                               _SCALED_MM_MIN_BATCH)
+        # Reused padded input for batches smaller than _pad_threshold.
+        self._pad_buf: Optional[torch.Tensor] = None
+        # Reused output for the dynamic activation scale.
+        self._dyn_scale_buf: Optional[torch.Tensor] = None
 
     def _create_scale_param(
         self,
@@ -196,16 +248,14 @@ class Fp8LinearMethod(LinearMethodBase):
     def scales_shard_indexer(
             self, param: torch.Tensor, loaded_weight: torch.Tensor,
             shard_id: Union[str, int]) -> Tuple[torch.Tensor, torch.Tensor]:
-        qkv_idxs = {"q": 0, "k": 1, "v": 2}
-
-        if isinstance(shard_id, int):
-            pass
-        elif isinstance(shard_id, str):
-            if shard_id not in qkv_idxs:
-                raise ValueError(f"Unknown shard_id: {shard_id}")
-            shard_id = qkv_idxs[shard_id]
-        else:
-            ValueError(f"Shard id must be int or str but got {type(shard_id)}")
+        if isinstance(shard_id, str):
+            try:
+                shard_id = _QKV_IDXS[shard_id]
+            except KeyError:
+                raise ValueError(f"Unknown shard_id: {shard_id}") from None
+        elif not isinstance(shard_id, int):
+            raise ValueError(
+                f"Shard id must be int or str but got {type(shard_id)}")
 
         return param[shard_id], loaded_weight
 
@@ -227,21 +277,25 @@ class Fp8LinearMethod(LinearMethodBase):
         # weights into a single fp8 weight with a single weight scale.
         else:
             # WEIGHT_SCALE / WEIGHT
-            #   Loop over logical weights, requantizing with single scale.
+            #   Requantize all logical weights to the single max scale in
+            #   one pass: every row of a logical weight is rescaled by
+            #   weight_scale[idx] / max_w_scale.
             max_w_scale = layer.weight_scale.max()
-            start = 0
-            for idx, logical_width in enumerate(layer.logical_widths):
-                end = start + logical_width
-                weight_dq = per_tensor_dequantize(layer.weight[start:end, :],
-                                                  layer.weight_scale[idx])
-
-                layer.weight[start:end, :] = per_tensor_quantize(
-                    weight_dq, layer.weight_scale.max())
-                start = end
+            row_scale = torch.repeat_interleave(
+                (layer.weight_scale / max_w_scale).to(torch.float16),
+                torch.tensor(layer.logical_widths, device=layer.weight.device),
+                output_size=layer.weight.shape[0])
+            weight_dq = layer.weight.to(torch.float16).mul_(
+                row_scale.unsqueeze(1))
+            layer.weight.copy_(
+                weight_dq.clamp_(min=_FP8_FINFO.min, max=_FP8_FINFO.max))
             layer.weight_scale = Parameter(max_w_scale, requires_grad=False)
 
             # WEIGHT
-            #   Transpose weight for passing to torch._scaled_mm
+            #   Transpose weight for passing to torch._scaled_mm. The
+            #   transposed view of the contiguous (out, in) weight is already
+            #   the column-major mat2 _scaled_mm requires, so it must not be
+            #   made contiguous.
             weight = layer.weight
             layer.weight = Parameter(weight.t(), requires_grad=False)
 
@@ -268,14 +322,24 @@ class Fp8LinearMethod(LinearMethodBase):
         # ops.scaled_fp8_quant supports both dynamic and static quant.
         #   If dynamic, layer.act_scale is None and x_scale computed from x.
         #   If static,  layer.act_scale is scalar and x_scale set to act_scale.
+        # Before Hopper, torch._scaled_mm is more performant for matrices
+        # with batch dimension > 16, so small batches are quantized into the
+        # head of a persistent padded buffer. The tail rows are never zeroed:
+        # each output row depends only on its own input row, and the rows
+        # computed from the tail are narrowed away below.
+        num_tokens = x.shape[0]
+        out = (self._get_pad_buf(x)
+               if num_tokens < self._pad_threshold else None)
+        if layer.act_scale is None:
+            scale_out = self._get_dyn_scale_buf(x)
+        else:
+            scale_out = None
         qinput, x_scale = scaled_fp8_quant(x,
                                            layer.act_scale,
-                                           batch_dim_padding=17)
+                                           out=out,
+                                           scale_out=scale_out)
 
-        # Fused GEMM_DQ -- note we padded the input above because
-        # torch._scaled_mm is more performant for matrices with
-        # batch dimension > 16. Note that this could change
-        # in the future.
+        # Fused GEMM_DQ
         output, _ = torch._scaled_mm(
             qinput,
             layer.weight,
@@ -285,23 +349,28 @@ class Fp8LinearMethod(LinearMethodBase):
             bias=bias,
         )
 
-        return torch.narrow(output, 0, 0, x.shape[0])
-
-
-def all_close_1d(x: torch.Tensor) -> bool:
-    assert len(x.shape) == 1
-    return all(torch.allclose(x[0], x[i]) for i in range(x.shape[0]))
+        if out is None:
+            return output
+        return torch.narrow(output, 0, 0, num_tokens)
 
+    def _get_pad_buf(self, x: torch.Tensor) -> torch.Tensor:
+        buf = self._pad_buf
+        if (buf is None or buf.device != x.device
+                or buf.shape[1:] != x.shape[1:]):
+            buf = torch.empty((_SCALED_MM_MIN_BATCH, *x.shape[1:]),
+                              device=x.device,
+                              dtype=torch.float8_e4m3fn)
+            self._pad_buf = buf
+        return buf
 
-def per_tensor_quantize(tensor: torch.Tensor,
-                        inv_scale: float) -> torch.Tensor:
-    finfo = torch.finfo(torch.float8_e4m3fn)
-    qweight = (tensor / inv_scale).clamp(min=finfo.min, max=finfo.max)
-    return qweight.to(torch.float8_e4m3fn)
+    def _get_dyn_scale_buf(self, x: torch.Tensor) -> torch.Tensor:
+        buf = self._dyn_scale_buf
+        if buf is None or buf.device != x.device:
+            buf = torch.empty(1, device=x.device, dtype=torch.float32)
+            self._dyn_scale_buf = buf
+        return buf
 
 
-def per_tensor_dequantize(tensor: torch.Tensor,
-                          inv_scale: float) -> torch.Tensor:
-    fake_qweight = tensor.to(torch.float16)
-    dq_weight = fake_qweight * inv_scale
-    return dq_weight
+def all_close_1d(x: torch.Tensor) -> bool:
+    assert len(x.shape) == 1
+    return torch.allclose(x[0].expand_as(x), x)
@@ -0,0 +1,75 @@
+import torch
+import triton
+import triton.language as tl
+
+# Largest input (in elements) routed to the single-program kernel. One
+# program streams the input twice, so its cost grows with numel while the
+# CUDA path spreads the work over one block per token. This value is an
+# unmeasured placeholder (four decode tokens at hidden size 4096); set it
+# from tests/benchmarks/fp8_quant.py before enabling the kernel by default.
+MAX_NUMEL = 16384
+
+_FP8_MAX = torch.finfo(torch.float8_e4m3fn).max
+
+
+@triton.jit
+def _dynamic_scaled_fp8_quant_kernel(
+    out_ptr,
+    input_ptr,
+    scale_ptr,
+    num_elems,
+    FP8_MAX: tl.constexpr,
+    BLOCK_SIZE: tl.constexpr,
+):
+    offsets = tl.arange(0, BLOCK_SIZE)
+
+    # Pass 1: absolute maximum, reduced in registers.
+    amax = tl.zeros([BLOCK_SIZE], dtype=tl.float32)
+    for start in range(0, num_elems, BLOCK_SIZE):
+        mask = start + offsets < num_elems
+        x = tl.load(input_ptr + start + offsets, mask=mask, other=0.0)
+        amax = tl.maximum(amax, tl.abs(x.to(tl.float32)))
+    # Round-to-nearest division, as in the CUDA kernel.
+    scale = tl.math.div_rn(tl.max(amax, axis=0), FP8_MAX)
+    tl.store(scale_ptr, scale)
+
+    # Pass 2: scale, clamp and convert, following scaled_fp8_conversion,
+    # including an all-zero input: 0 / 0 is NaN, which fmin/fmax there
+    # clamp to FP8_MAX. The final conversion may round differently from
+    # the CUDA kernel (some Triton versions go through fp16 first).
+    for start in range(0, num_elems, BLOCK_SIZE):
+        mask = start + offsets < num_elems
+        x = tl.load(input_ptr + start + offsets, mask=mask, other=0.0)
+        x = tl.math.div_rn(x.to(tl.float32), scale)
+        x = tl.where(x != x, FP8_MAX, x)
+        x = tl.minimum(tl.maximum(x, -FP8_MAX), FP8_MAX)
+        tl.store(out_ptr + start + offsets,
+                 x.to(out_ptr.dtype.element_ty),
+                 mask=mask)
+
+
+def dynamic_scaled_fp8_quant(
+    out: torch.Tensor,
+    input: torch.Tensor,
+    scale: torch.Tensor,
+) -> None:
+    """Triton counterpart of ops.dynamic_scaled_fp8_quant for small inputs.
+
+    Computes the amax, the scale and the FP8 output in a single launch of a
+    single program, so decode-sized batches avoid the reduction kernel, the
+    separate quantization kernel and the zero-init of the scale. Unlike the
+    CUDA kernel, scale is written rather than atomically updated and does
+    not need to be initialized. Meant for inputs of at most MAX_NUMEL
+    elements. input must be contiguous; out may have more rows than input,
+    in which case only its head is written.
+    """
+    assert input.is_contiguous()
+    _dynamic_scaled_fp8_quant_kernel[(1, )](
+        out,
+        input,
+        scale,
+        input.numel(),
+        FP8_MAX=_FP8_MAX,
+        BLOCK_SIZE=1024,
+        num_warps=8,
+    )
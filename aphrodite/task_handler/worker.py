@@ -1,7 +1,8 @@
 """A GPU worker class."""
 import gc
 import os
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import (TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple,
+                    Union)
 
 import torch
 import torch.distributed
@@ -14,6 +15,7 @@ from aphrodite.common.sequence import (ExecuteModelRequest, PoolerOutput,
                                        SamplerOutput)
 from aphrodite.distributed import (broadcast_tensor_dict,
                                    ensure_model_parallel_initialized,
+                                   get_tensor_model_parallel_rank,
                                    init_distributed_environment,
                                    set_custom_all_reduce)
 from aphrodite.lora.request import LoRARequest
@@ -23,6 +25,9 @@ from aphrodite.task_handler.embedding_model_runner import EmbeddingModelRunner
 from aphrodite.task_handler.model_runner import ModelRunner
 from aphrodite.task_handler.worker_base import WorkerBase
 
+if TYPE_CHECKING:
+    from aphrodite.modeling.model_loader.tensorizer import TensorizerConfig
+
 
 class Worker(WorkerBase):
     """A worker class that executes (a partition of) the model on a GPU.
@@ -121,6 +126,19 @@ class Worker(WorkerBase):
     def load_model(self):
         self.model_runner.load_model()
 
+    def save_tensorized_model(
+        self,
+        tensorizer_config: "TensorizerConfig",
+        encryption_key: Optional[bytes] = None,
+    ) -> None:
+        """Serialize this worker's tensor-parallel shard of the model."""
+        from aphrodite.modeling.model_loader.tensorizer import (
+            save_tensorized_model)
+        save_tensorized_model(
+            self.model_runner.model,
+            tensorizer_config.for_rank(get_tensor_model_parallel_rank()),
+            encryption_key)
+
     @torch.inference_mode()
     def determine_num_available_blocks(self) -> Tuple[int, int]:
         """Profiles the peak memory usage of the model to determine how many
@@ -60,6 +60,18 @@ Which downloads the model tensors from your S3 bucket and deserializes them.
 You can also provide a `--keyfile` argument to decrypt the model weights if 
 they were serialized with encryption.
 
+With tensor parallelism, each rank serializes and loads its own shard. Pass
+the same `--tensor-parallel-size` to both commands; serializing then writes
+`model-rank-{rank}.tensors` files, and the path to deserialize from is that
+`{rank}` template, which each rank fills in with its own index:
+
+python -m examples.tensorize_aphrodite_model \
+   --model EleutherAI/gpt-j-6B \
+   --dtype float16 \
+   --tensor-parallel-size 2 \
+   deserialize \
+   --path-to-tensors s3://my-bucket/aphrodite/EleutherAI/gpt-j-6B/v1/model-rank-{rank}.tensors
+
 For more information on the available arguments for serializing, run 
 `python -m examples.tensorize_aphrodite_model serialize --help`.
 
@@ -167,6 +179,7 @@ def parse_args():
 def deserialize():
     llm = LLM(model=args.model,
               load_format="tensorizer",
+              tensor_parallel_size=args.tensor_parallel_size,
               model_loader_extra_config=tensorizer_config
     )
     return llm
@@ -203,8 +216,10 @@ model_name = model_ref.split("/")[1]
 os.environ["MASTER_ADDR"] = "127.0.0.1"
 os.environ["MASTER_PORT"] = "8080"
 
-init_distributed_environment(world_size=1, rank=0, local_rank=0)
-initialize_model_parallel()
+if args.tensor_parallel_size == 1:
+    # With tensor parallelism the engine sets up its own process group.
+    init_distributed_environment(world_size=1, rank=0, local_rank=0)
+    initialize_model_parallel()
 
 keyfile = args.keyfile if args.keyfile else None
 
@@ -226,7 +241,11 @@ if args.command == "serialize":
     input_dir = args.serialized_directory.rstrip('/')
     suffix = args.suffix if args.suffix else uuid.uuid4().hex
     base_path = f"{input_dir}/aphrodite/{model_ref}/{suffix}"
-    model_path = f"{base_path}/model.tensors"
+    if engine_args.tensor_parallel_size > 1:
+        # One file per rank; each rank writes (and later loads) its own.
+        model_path = f"{base_path}/model-rank-{{rank}}.tensors"
+    else:
+        model_path = f"{base_path}/model.tensors"
     tensorizer_config = TensorizerConfig(
         tensorizer_uri=model_path,
         **credentials)
@@ -4,6 +4,7 @@ import os
 import re
 import subprocess
 import sys
+from functools import lru_cache
 from shutil import which
 from typing import List
 
@@ -56,8 +57,14 @@ class cmake_build_ext(build_ext):
 
     #
     # Determine number of compilation jobs and optionally nvcc compile threads.
+    # The result is computed once per command and reused for every extension.
     #
     def compute_num_jobs(self):
+        if getattr(self, "_num_jobs", None) is None:
+            self._num_jobs = self._compute_num_jobs()
+        return self._num_jobs
+
+    def _compute_num_jobs(self):
         # `num_jobs` is either the value of the MAX_JOBS environment variable
         # (if defined) or the number of CPUs available.
         num_jobs = os.environ.get("MAX_JOBS", None)
@@ -180,19 +187,23 @@ class cmake_build_ext(build_ext):
         if not os.path.exists(self.build_temp):
             os.makedirs(self.build_temp)
 
-        # Build all the extensions
+        # Configure all the extensions, then build every target with a single
+        # cmake invocation so the build tool can schedule across targets
+        # (CMake >= 3.15 accepts several --target values).
         for ext in self.extensions:
             self.configure(ext)
 
-            ext_target_name = remove_prefix(ext.name, "aphrodite.")
-            num_jobs, _ = self.compute_num_jobs()
+        targets = [
+            remove_prefix(ext.name, "aphrodite.") for ext in self.extensions
+        ]
+        num_jobs, _ = self.compute_num_jobs()
 
-            build_args = [
-                '--build', '.', '--target', ext_target_name, '-j',
-                str(num_jobs)
-            ]
+        build_args = [
+            '--build', '.', '--target', *targets, '-j',
+            str(num_jobs)
+        ]
 
-            subprocess.check_call(['cmake', *build_args], cwd=self.build_temp)
+        subprocess.check_call(['cmake', *build_args], cwd=self.build_temp)
 
 
 def _is_cuda() -> bool:
@@ -207,6 +218,7 @@ def _is_hip() -> bool:
             and torch.version.hip is not None
 
 
+@lru_cache(maxsize=None)
 def _is_neuron() -> bool:
     torch_neuronx_installed = True
     try:
@@ -220,40 +232,31 @@ def _is_cpu() -> bool:
     return APHRODITE_TARGET_DEVICE == "cpu"
 
 
+@lru_cache(maxsize=None)
+def _min_device_capability_major() -> int:
+    # Lowest compute capability major version across visible GPUs, queried
+    # once for all the _install_* checks. Without GPUs nothing is excluded.
+    return min((torch.cuda.get_device_capability(i)[0]
+                for i in range(torch.cuda.device_count())),
+               default=99)
+
+
 def _install_quants() -> bool:
     install_quants = bool(
         int(os.getenv("APHRODITE_INSTALL_QUANT_KERNELS", "1")))
-    device_count = torch.cuda.device_count()
-    for i in range(device_count):
-        major, minor = torch.cuda.get_device_capability(i)
-        if major < 6:
-            install_quants = False
-            break
-    return install_quants
+    return install_quants and _min_device_capability_major() >= 6
 
 
 def _install_punica() -> bool:
     install_punica = bool(
         int(os.getenv("APHRODITE_INSTALL_PUNICA_KERNELS", "1")))
-    device_count = torch.cuda.device_count()
-    for i in range(device_count):
-        major, minor = torch.cuda.get_device_capability(i)
-        if major < 8:
-            install_punica = False
-            break
-    return install_punica
+    return install_punica and _min_device_capability_major() >= 8
 
 
 def _install_hadamard() -> bool:
     install_hadamard = bool(
         int(os.getenv("APHRODITE_INSTALL_HADAMARD_KERNELS", "1")))
-    device_count = torch.cuda.device_count()
-    for i in range(device_count):
-        major, minor = torch.cuda.get_device_capability(i)
-        if major <= 6:
-            install_hadamard = False
-            break
-    return install_hadamard
+    return install_hadamard and _min_device_capability_major() > 6
 
 
 def get_hipcc_rocm_version():
@@ -297,6 +300,7 @@ def get_neuronxcc_version():
         raise RuntimeError("Could not find HIP version in the output")
 
 
+@lru_cache(maxsize=None)
 def get_nvcc_cuda_version() -> Version:
     """Get the CUDA version from nvcc.
 
@@ -0,0 +1,64 @@
+import argparse
+import time
+
+import torch
+
+from aphrodite._quant_C import quant_ops as ops
+from aphrodite.quantization import fp8_quant_triton
+
+
+@torch.inference_mode()
+def main(num_tokens: int, hidden_size: int, dtype: torch.dtype,
+         num_iters: int) -> None:
+    x = torch.randn(num_tokens, hidden_size, dtype=dtype, device="cuda")
+    out = torch.empty_like(x, dtype=torch.float8_e4m3fn)
+    scale = torch.empty(1, device="cuda", dtype=torch.float32)
+
+    def run_cuda() -> None:
+        # Same work as the CUDA path of scaled_fp8_quant, including the
+        # zero-init of the atomically reduced scale.
+        scale.zero_()
+        ops.dynamic_scaled_fp8_quant(out, x, scale)
+
+    def run_triton() -> None:
+        fp8_quant_triton.dynamic_scaled_fp8_quant(out, x, scale)
+
+    def run_benchmark(fn) -> float:
+        torch.cuda.synchronize()
+        start_time = time.perf_counter()
+        for _ in range(num_iters):
+            fn()
+        torch.cuda.synchronize()
+        return (time.perf_counter() - start_time) / num_iters
+
+    # Triton runs past MAX_NUMEL too, so the crossover can be re-measured.
+    for name, fn in (("cuda", run_cuda), ("triton", run_triton)):
+        # Warmup.
+        for _ in range(3):
+            fn()
+        latency = run_benchmark(fn)
+        print(f"{name}: {latency * 1000000:.3f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the dynamic FP8 quantization kernels.")
+    parser.add_argument("--num-tokens", type=int, default=1)
+    parser.add_argument("--hidden-size", type=int, default=4096)
+    parser.add_argument("--dtype",
+                        type=str,
+                        choices=["half", "bfloat16", "float"],
+                        default="half")
+    parser.add_argument("--num-iters", type=int, default=1000)
+    args = parser.parse_args()
+    print(args)
+
+    dtype_to_torch_dtype = {
+        "half": torch.half,
+        "bfloat16": torch.bfloat16,
+        "float": torch.float,
+    }
+    main(num_tokens=args.num_tokens,
+         hidden_size=args.hidden_size,
+         dtype=dtype_to_torch_dtype[args.dtype],
+         num_iters=args.num_iters)
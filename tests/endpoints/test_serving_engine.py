@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from aphrodite.endpoints.openai.serving_engine import (OpenAIServing,
+                                                       _TokenizerBatcher)
+
+pytestmark = pytest.mark.asyncio
+
+
+class _CountingServing(OpenAIServing):
+    """OpenAIServing whose _post_init is scripted instead of touching an
+    engine."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        super().__init__(engine=None,
+                         served_model_names=["test-model"],
+                         lora_modules=None)
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    async def _post_init(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("init failed")
+
+
+async def test_ensure_init_runs_once_for_concurrent_callers():
+    serving = _CountingServing(delay=0.01)
+    await asyncio.gather(*(serving._ensure_init() for _ in range(8)))
+    assert serving.calls == 1
+
+
+async def test_ensure_init_survives_cancelled_caller():
+    serving = _CountingServing(delay=0.05)
+    first = asyncio.create_task(serving._ensure_init())
+    await asyncio.sleep(0.01)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    # The shared initialization kept running and later callers reuse it.
+    await asyncio.wait_for(serving._ensure_init(), timeout=1)
+    assert serving.calls == 1
+
+
+async def test_ensure_init_retries_after_failure():
+    serving = _CountingServing(failures=1)
+    with pytest.raises(RuntimeError):
+        await serving._ensure_init()
+    await serving._ensure_init()
+    assert serving.calls == 2
+
+
+async def test_ensure_init_retries_after_task_cancelled():
+    serving = _CountingServing(delay=0.05)
+    caller = asyncio.create_task(serving._ensure_init())
+    await asyncio.sleep(0.01)
+    serving._init_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    serving.delay = 0
+    await asyncio.wait_for(serving._ensure_init(), timeout=1)
+    assert serving.calls == 2
+
+
+class _RecordingBatchFn:
+    """Doubles each item; rejects negative items like a tokenizer would
+    reject an out-of-range token id."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        if any(item < 0 for item in items):
+            raise ValueError("negative item")
+        return [item * 2 for item in items]
+
+
+async def test_batcher_coalesces_concurrent_items():
+    batch_fn = _RecordingBatchFn()
+    batcher = _TokenizerBatcher(batch_fn)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+    assert results == [0, 2, 4, 6, 8]
+    assert batch_fn.batches == [[0, 1, 2, 3, 4]]
+    await batcher.close()
+
+
+async def test_batcher_isolates_failing_item():
+    batch_fn = _RecordingBatchFn()
+    batcher = _TokenizerBatcher(batch_fn)
+    results = await asyncio.gather(batcher.submit(1),
+                                   batcher.submit(-1),
+                                   batcher.submit(3),
+                                   return_exceptions=True)
+    assert results[0] == 2
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 6
+    await batcher.close()
+
+
+async def test_batcher_does_not_delay_lone_item():
+    batcher = _TokenizerBatcher(_RecordingBatchFn(), batch_wait_s=10)
+    assert await asyncio.wait_for(batcher.submit(4), timeout=1) == 8
+    await batcher.close()
+
+
+async def test_batcher_close_stops_worker():
+    batcher = _TokenizerBatcher(_RecordingBatchFn())
+    await batcher.submit(1)
+    worker = batcher._worker
+    await batcher.close()
+    assert worker.cancelled()
+    # A later submit starts a fresh worker.
+    assert await batcher.submit(2) == 4
+    await batcher.close()
+
+
+async def test_batcher_close_cancels_in_flight_batch():
+    batcher = _TokenizerBatcher(_RecordingBatchFn(), batch_wait_s=10)
+    requests = [asyncio.create_task(batcher.submit(i)) for i in range(2)]
+    # Let the worker take the first item and start waiting for stragglers.
+    await asyncio.sleep(0.01)
+    await batcher.close()
+    gathered = asyncio.gather(*requests, return_exceptions=True)
+    results = await asyncio.wait_for(gathered, timeout=1)
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+
+
+async def test_batcher_fails_batch_on_result_count_mismatch():
+    batcher = _TokenizerBatcher(lambda items: items[1:])
+    requests = asyncio.gather(*(batcher.submit(i) for i in range(3)),
+                              return_exceptions=True)
+    results = await asyncio.wait_for(requests, timeout=1)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    await batcher.close()
@@ -0,0 +1,86 @@
+import pytest
+import torch
+
+from aphrodite._quant_C import quant_ops as ops
+from aphrodite.quantization import fp8_quant_triton
+
+DTYPES = [torch.half, torch.bfloat16, torch.float]
+# (num_tokens, hidden_size); the last fills MAX_NUMEL exactly.
+SHAPES = [(1, 5), (1, 4096), (3, 1000), (4, 4096), (16, 1024)]
+SEEDS = [0]
+CUDA_DEVICES = [
+    f"cuda:{i}" for i in range(1 if torch.cuda.device_count() == 1 else 2)
+]
+
+FP8_SUPPORTED = (torch.cuda.is_available()
+                 and torch.cuda.get_device_capability() >= (8, 9))
+
+pytestmark = pytest.mark.skipif(
+    not FP8_SUPPORTED, reason="FP8 requires compute capability 8.9 or newer.")
+
+
+def _reference(x: torch.Tensor):
+    out = torch.empty_like(x, dtype=torch.float8_e4m3fn)
+    scale = torch.zeros(1, device=x.device, dtype=torch.float32)
+    ops.dynamic_scaled_fp8_quant(out, x, scale)
+    return out, scale
+
+
+def _assert_fp8_close(out: torch.Tensor, ref_out: torch.Tensor) -> None:
+    # Triton may convert fp32 -> fp8 through fp16 and so round twice; allow
+    # one FP8 step (relative 2**-3, absolute 2**-9 for subnormals).
+    torch.testing.assert_close(out.float(),
+                               ref_out.float(),
+                               atol=2**-9,
+                               rtol=2**-3)
+
+
+def _triton(x: torch.Tensor):
+    out = torch.empty_like(x, dtype=torch.float8_e4m3fn)
+    scale = torch.empty(1, device=x.device, dtype=torch.float32)
+    fp8_quant_triton.dynamic_scaled_fp8_quant(out, x, scale)
+    return out, scale
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("dtype", DTYPES)
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("device", CUDA_DEVICES)
+@torch.inference_mode()
+def test_dynamic_scaled_fp8_quant(shape, dtype, seed, device) -> None:
+    torch.random.manual_seed(seed)
+    torch.cuda.manual_seed(seed)
+    x = torch.randn(shape, dtype=dtype, device=device) * 3
+
+    ref_out, ref_scale = _reference(x)
+    out, scale = _triton(x)
+    assert torch.equal(scale, ref_scale)
+    _assert_fp8_close(out, ref_out)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("dtype", DTYPES)
+@pytest.mark.parametrize("device", CUDA_DEVICES)
+@torch.inference_mode()
+def test_dynamic_scaled_fp8_quant_all_zeros(shape, dtype, device) -> None:
+    x = torch.zeros(shape, dtype=dtype, device=device)
+
+    ref_out, ref_scale = _reference(x)
+    out, scale = _triton(x)
+    assert torch.equal(scale, ref_scale)
+    assert torch.equal(out.view(torch.uint8), ref_out.view(torch.uint8))
+
+
+@pytest.mark.parametrize("dtype", DTYPES)
+@pytest.mark.parametrize("device", CUDA_DEVICES)
+@torch.inference_mode()
+def test_dynamic_scaled_fp8_quant_padded_out(dtype, device) -> None:
+    x = torch.randn(3, 1024, dtype=dtype, device=device)
+    out = torch.zeros(17, 1024, dtype=torch.float8_e4m3fn, device=device)
+    scale = torch.empty(1, device=device, dtype=torch.float32)
+    fp8_quant_triton.dynamic_scaled_fp8_quant(out, x, scale)
+
+    ref_out, ref_scale = _reference(x)
+    assert torch.equal(scale, ref_scale)
+    _assert_fp8_close(out[:3], ref_out)
+    assert not out[3:].view(torch.uint8).any()
@@ -0,0 +1,61 @@
+import random
+from itertools import takewhile
+from os.path import commonprefix
+from typing import List, Set
+
+import pytest
+
+from aphrodite.processing.block.prefix_caching_block import (
+    PrefixCachingBlockAllocator)
+
+
+def _reference_common_computed_block_ids(seq_block_ids: List[List[int]],
+                                         computed: Set[int]) -> List[int]:
+    """The original implementation: the common prefix of each sequence's
+    computed blocks, excluding its last block, ignoring sequences that have
+    none. commonprefix returns "" when no sequence has any, which callers
+    only ever treated as an empty sequence."""
+    ids_list = [
+        list(takewhile(lambda block_id: block_id in computed, seq[:-1]))
+        for seq in seq_block_ids
+    ]
+    return list(commonprefix([ids for ids in ids_list if ids != []]))
+
+
+def _allocator(computed: Set[int]) -> PrefixCachingBlockAllocator:
+    allocator = PrefixCachingBlockAllocator(num_blocks=64, block_size=16)
+    allocator.block_is_computed = computed.__contains__
+    return allocator
+
+
+@pytest.mark.parametrize("seq_block_ids, computed, expected", [
+    ([], set(), []),
+    ([[]], set(), []),
+    ([[1]], {1}, []),
+    ([[1, 2, 3]], {1, 2, 3}, [1, 2]),
+    ([[1, 2, 3], [1, 2, 4]], {1, 2, 3, 4}, [1, 2]),
+    ([[1, 2, 3], [5, 6]], {1, 2, 3, 5}, []),
+    ([[1, 2, 3], [7, 8], [1, 2, 9]], {1, 2, 3, 9}, [1, 2]),
+    ([[1, 2, 3, 4], [1, 2]], {1, 2, 3}, [1]),
+])
+def test_get_common_computed_block_ids(seq_block_ids, computed, expected):
+    allocator = _allocator(computed)
+    assert allocator.get_common_computed_block_ids(seq_block_ids) == expected
+    assert _reference_common_computed_block_ids(seq_block_ids,
+                                                computed) == expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_get_common_computed_block_ids_matches_reference(seed):
+    rng = random.Random(seed)
+    computed = set(rng.sample(range(16), rng.randint(0, 16)))
+    shared = [rng.randrange(16) for _ in range(rng.randint(0, 6))]
+    seq_block_ids = [
+        shared[:rng.randint(0, len(shared))] +
+        [rng.randrange(16) for _ in range(rng.randint(0, 4))]
+        for _ in range(rng.randint(0, 5))
+    ]
+    allocator = _allocator(computed)
+    assert allocator.get_common_computed_block_ids(
+        seq_block_ids) == _reference_common_computed_block_ids(
+            seq_block_ids, computed)
@@ -0,0 +1,65 @@
+import pytest
+
+from aphrodite.common.config import ParallelConfig
+from aphrodite.modeling.model_loader.tensorizer import TensorizerConfig
+
+
+def _parallel_config(tensor_parallel_size: int) -> ParallelConfig:
+    return ParallelConfig(pipeline_parallel_size=1,
+                          tensor_parallel_size=tensor_parallel_size,
+                          worker_use_ray=False)
+
+
+def test_for_rank_fills_in_rank():
+    config = TensorizerConfig(
+        tensorizer_uri="s3://bucket/model-rank-{rank}.tensors")
+    shard = config.for_rank(3)
+    assert shard.tensorizer_uri == "s3://bucket/model-rank-3.tensors"
+    assert not shard._is_sharded
+    # The template itself is left untouched.
+    assert config.tensorizer_uri == "s3://bucket/model-rank-{rank}.tensors"
+    assert config._is_sharded
+
+
+def test_for_rank_keeps_other_braces():
+    config = TensorizerConfig(
+        tensorizer_uri="s3://bucket/{model}/{0}/rank-{rank}.tensors")
+    shard = config.for_rank(1)
+    assert shard.tensorizer_uri == "s3://bucket/{model}/{0}/rank-1.tensors"
+
+
+def test_for_rank_unsharded_returns_self():
+    config = TensorizerConfig(tensorizer_uri="s3://bucket/{model}.tensors")
+    assert not config._is_sharded
+    assert config.for_rank(2) is config
+
+
+def test_is_sharded_follows_uri_changes():
+    config = TensorizerConfig(tensorizer_uri="model.tensors")
+    assert not config._is_sharded
+    config.tensorizer_uri = "model-rank-{rank}.tensors"
+    assert config._is_sharded
+    assert config.for_rank(0).tensorizer_uri == "model-rank-0.tensors"
+
+
+def test_is_sharded_false_for_non_str_uri():
+    config = TensorizerConfig(tensorizer_uri=b"model-rank-{rank}.tensors")
+    assert not config._is_sharded
+    assert config.for_rank(1) is config
+
+
+@pytest.mark.parametrize("uri", ["model.tensors", "model-{rank}.tensors"])
+def test_verify_with_parallel_config_single_gpu(uri):
+    TensorizerConfig(tensorizer_uri=uri).verify_with_parallel_config(
+        _parallel_config(1))
+
+
+def test_verify_with_parallel_config_sharded():
+    config = TensorizerConfig(tensorizer_uri="model-rank-{rank}.tensors")
+    config.verify_with_parallel_config(_parallel_config(2))
+
+
+def test_verify_with_parallel_config_rejects_unsharded():
+    config = TensorizerConfig(tensorizer_uri="model.tensors")
+    with pytest.raises(ValueError, match="{rank}"):
+        config.verify_with_parallel_config(_parallel_config(2))